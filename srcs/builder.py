@@ -6,22 +6,78 @@ Used when the user wants to verify their corrections with [v].
 """
 
 import os
+import shutil
 import subprocess
+from typing import Union
 
 from type_defs import BuildResult
 
+# Directories where distributions install ccache's compiler symlinks
+# (gcc, cc, clang...).  Prepending one to PATH routes every compiler call
+# through ccache, even when the user's Makefile hardcodes ``CC = gcc``.
+_CCACHE_MASQUERADE_DIRS = [
+    "/usr/lib/ccache",
+    "/usr/lib64/ccache",
+    "/usr/local/opt/ccache/libexec",
+    "/opt/homebrew/opt/ccache/libexec",
+]
 
-def rebuild_project(executable_path: str) -> BuildResult:
+
+def _ccache_env() -> dict[str, str]:
+    """
+    Build the environment used to run make, routed through ccache if present.
+
+    Returns:
+        A copy of os.environ, with PATH (or CC/CXX) pointing at ccache
+        when it is installed.  Unchanged otherwise.
+    """
+    env = dict(os.environ)
+
+    if not shutil.which("ccache"):
+        return env
+
+    for masquerade_dir in _CCACHE_MASQUERADE_DIRS:
+        if os.path.isdir(masquerade_dir):
+            env["PATH"] = masquerade_dir + os.pathsep + env.get("PATH", "")
+            return env
+
+    # No symlink directory: only helps Makefiles relying on make's default CC
+    env.setdefault("CC", "ccache gcc")
+    env.setdefault("CXX", "ccache g++")
+    return env
+
+
+def _make_jobs() -> int:
     """
-    Recompile the user's project using make.
+    Number of parallel make jobs, overridable with LEAX_MAKE_JOBS.
+
+    Returns:
+        Job count (at least 1).
+    """
+    override = os.environ.get("LEAX_MAKE_JOBS", "")
+    if override.isdigit() and int(override) > 0:
+        return int(override)
+    return os.cpu_count() or 1
+
+
+# Computed once: ccache presence and core count do not change during a session
+_BUILD_ENV = _ccache_env()
+_MAKE_JOBS = _make_jobs()
+
+
+def start_rebuild(executable_path: str) -> Union[subprocess.Popen, BuildResult]:
+    """
+    Launch make in the background and return immediately.
+
+    Lets the caller keep the interface alive (spinner) while compiling.
+    The result is collected with finish_rebuild().
 
     Args:
         executable_path: Path to the executable (e.g., "./test_mistral/leaky")
 
     Returns:
-        dict: Dictionary with keys:
-            - 'success' (bool): Whether compilation succeeded
-            - 'output' (str): Compilation output or error message
+        The running make process, or a failed BuildResult if make could
+        not be started (no Makefile, make missing...)
     """
 
     # Extract the project directory from executable path
@@ -46,22 +102,51 @@ def rebuild_project(executable_path: str) -> BuildResult:
 
     try:
         # Run make from the project directory
-        result = subprocess.run(
-            ["make"], capture_output=True, text=True, timeout=30, cwd=project_dir
+        return subprocess.Popen(
+            ["make", f"-j{_MAKE_JOBS}"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=project_dir,
+            env=_BUILD_ENV,
         )
 
-        if result.returncode == 0:
+    except Exception as e:
+        return {"success": False, "output": f"Error during compilation: {str(e)}"}
+
+
+def finish_rebuild(build: Union[subprocess.Popen, BuildResult]) -> BuildResult:
+    """
+    Wait for a build started by start_rebuild() and report its result.
+
+    Args:
+        build: Value returned by start_rebuild()
+
+    Returns:
+        dict: Dictionary with keys:
+            - 'success' (bool): Whether compilation succeeded
+            - 'output' (str): Compilation output or error message
+    """
+
+    # make could not be started: the error is already a BuildResult
+    if isinstance(build, dict):
+        return build
+
+    try:
+        stdout, stderr = build.communicate(timeout=30)
+
+        if build.returncode == 0:
+            # Output discarded on success: never decoded
             return {"success": True, "output": "Compilation successful"}
         else:
+            details = (stderr or stdout).decode("utf-8", errors="replace")
             return {
                 "success": False,
-                "output": (
-                    "Compilation error\n\n"
-                    f"{result.stderr if result.stderr else result.stdout}"
-                ),
+                "output": f"Compilation error\n\n{details}",
             }
 
     except subprocess.TimeoutExpired:
+        build.kill()
+        build.communicate()
         return {
             "success": False,
             "output": ("Compilation exceeded 30 second timeout\nCheck your Makefile"),
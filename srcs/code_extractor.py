@@ -6,10 +6,160 @@ Uses brace counting to identify function boundaries.
 """
 
 import os
-from typing import Optional
+import re
+import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from itertools import accumulate
+from typing import Iterable, Optional
 
 from type_defs import StackFrame, ExtractedFunction
 
+# Code brace offsets, nesting level after each brace, and the brace
+# positions grouped by (brace character, level) for bisect lookups.
+_BraceIndex = tuple[list[int], list[int], dict[tuple[str, int], list[int]]]
+
+# Source text, line start offsets and code brace index per file, keyed by
+# (absolute path, mtime) so that edits made between two [v] verifications
+# invalidate the entry.
+_file_cache: dict[tuple[str, float], tuple[str, list[int], _BraceIndex]] = {}
+
+# Extracted function code (None if unbalanced) per (absolute path, mtime,
+# start line): frames landing in the same function share one string.
+_function_code_cache: dict[tuple[str, float, int], Optional[str]] = {}
+
+# Resolved path (or None when not found) per source basename.
+_source_file_cache: dict[str, Optional[str]] = {}
+
+# Line that cannot belong to a function signature: blank, a lone closing
+# brace, or a preprocessor directive.  Matched in place against the cached
+# text, without slicing or stripping the line.
+_SIGNATURE_STOP_RE = re.compile(r"\s*(?:#|\}?\s*\Z)")
+
+# C tokens relevant to brace matching.  Only group 1 (a brace) is kept:
+# string literals, character literals and comments are matched so that the
+# braces they contain are skipped.  Unterminated literals stop at end of line.
+_BRACE_TOKEN_RE = re.compile(
+    r"([{}])"
+    r'|"(?:\\.|[^"\\\n])*"?'
+    r"|'(?:\\.|[^'\\\n])*'?"
+    r"|//[^\n]*"
+    r"|/\*.*?(?:\*/|\Z)",
+    re.DOTALL,
+)
+
+# Paths treated as system code (libc, standard headers...), matched anywhere
+# in the frame's file path.  One alternation scans the path a single time.
+_SYSTEM_FILE_RE = re.compile(r"/usr/include/|/usr/lib/|libc|libpthread")
+
+# Directories never searched when locating a source file by name.
+_SKIPPED_DIRS = {"node_modules", "build", "__pycache__"}
+
+# Give up searching after this many seconds (very large trees).
+_SEARCH_TIMEOUT = 2.0
+
+
+def _cache_key(filepath: str) -> Optional[tuple[str, float]]:
+    """
+    Build the cache key identifying the current version of a file.
+
+    Args:
+        filepath: Path to the source file
+
+    Returns:
+        (absolute path, mtime), or None if the file cannot be stat'ed
+    """
+    try:
+        return (os.path.abspath(filepath), os.stat(filepath).st_mtime)
+    except OSError:
+        return None
+
+
+def _load_source(
+    filepath: str, key: tuple[str, float]
+) -> Optional[tuple[str, list[int], _BraceIndex]]:
+    """
+    Read a source file once and serve later reads from the cache.
+
+    The file is kept as a single string plus the offset at which each line
+    starts, instead of one string object per line, and an index of the
+    braces that are actual code.
+
+    Args:
+        filepath: Path to the source file
+        key: Cache key returned by _cache_key()
+
+    Returns:
+        (text, line_offsets, brace_index), or None if the file cannot be read
+    """
+    source = _file_cache.get(key)
+    if source is None:
+        try:
+            with open(filepath, "r", encoding="utf-8") as f:
+                text = f.read()
+        except (IOError, UnicodeDecodeError):
+            return None
+        source = (text, _line_offsets(text), _index_braces(text))
+        _file_cache[key] = source
+
+    return source
+
+
+def _line_offsets(text: str) -> list[int]:
+    """
+    Compute the start offset of every line of a text.
+
+    Args:
+        text: Complete file content
+
+    Returns:
+        Offsets such that line i spans text[offsets[i]:offsets[i + 1]]
+    """
+    if not text:
+        return []
+
+    offsets = [0]
+    pos = text.find("\n")
+    while pos != -1 and pos + 1 < len(text):
+        offsets.append(pos + 1)
+        pos = text.find("\n", pos + 1)
+    return offsets
+
+
+def _index_braces(text: str) -> _BraceIndex:
+    """
+    Locate the braces of a C source and index them by nesting level.
+
+    The scan runs inside the regex engine, which jumps over string
+    literals and comments in one match each.  The running balance is
+    computed once per file so that matching a brace becomes a bisect in
+    the list of braces of the same character and level.
+
+    Args:
+        text: Complete file content
+
+    Returns:
+        (brace offsets, level after each brace, {(char, level): brace indices})
+    """
+    braces = [m.start() for m in _BRACE_TOKEN_RE.finditer(text) if m.lastindex]
+    levels = list(accumulate(1 if text[pos] == "{" else -1 for pos in braces))
+
+    by_level: dict[tuple[str, int], list[int]] = {}
+    for i, pos in enumerate(braces):
+        by_level.setdefault((text[pos], levels[i]), []).append(i)
+
+    return braces, levels, by_level
+
+
+def _line_end(text: str, offsets: list[int], index: int) -> int:
+    """Return the offset just past line ``index`` (newline included)."""
+    return offsets[index + 1] if index + 1 < len(offsets) else len(text)
+
+
+def _line_at(offsets: list[int], pos: int) -> int:
+    """Return the index of the line containing text offset ``pos``."""
+    return bisect_right(offsets, pos) - 1
+
 
 def extract_function(filepath: str, line_number: int) -> Optional[str]:
     """
@@ -28,64 +178,75 @@ def extract_function(filepath: str, line_number: int) -> Optional[str]:
         if not filepath:
             return None
 
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-    except (IOError, UnicodeDecodeError):
+    key = _cache_key(filepath)
+    if key is None:
         return None
 
-    if line_number < 1 or line_number > len(lines):
+    source = _load_source(filepath, key)
+    if source is None:
+        return None
+    text, offsets, brace_index = source
+
+    if line_number < 1 or line_number > len(offsets):
         return None
 
     # Find function start by going backwards
-    start_line = _find_function_start(lines, line_number - 1)
+    start_line = _find_function_start(text, offsets, brace_index, line_number - 1)
     if start_line is None:
         return None
 
+    # Same start always gives the same function: reuse an earlier extraction
+    span_key = key + (start_line,)
+    if span_key in _function_code_cache:
+        return _function_code_cache[span_key]
+
     # Find function end by counting braces
-    end_line = _find_function_end(lines, start_line)
+    end_line = _find_function_end(text, offsets, brace_index, start_line)
     if end_line is None:
+        _function_code_cache[span_key] = None
         return None
 
     # Extract from start to end of function
     result = []
     for i in range(start_line, end_line + 1):
         line_num = i + 1
-        result.append(f"{line_num}: {lines[i]}")
-    return "".join(result)
+        result.append(f"{line_num}: {text[offsets[i] : _line_end(text, offsets, i)]}")
+    code = "".join(result)
+    _function_code_cache[span_key] = code
+    return code
 
 
-def _find_function_start(lines: list[str], from_line: int) -> Optional[int]:
+def _find_function_start(
+    text: str, offsets: list[int], brace_index: _BraceIndex, from_line: int
+) -> Optional[int]:
     """
     Find the start of the enclosing function using brace depth counting.
 
-    Scans backwards from the given line, tracking brace depth.  Each ``}``
-    increments depth (entering a nested block in reverse), each ``{``
-    decrements it.  The first ``{`` that makes depth negative is the
-    function's opening brace.
+    Scanning backwards from the end of the given line, each ``}`` increments
+    depth and each ``{`` decrements it; the first ``{`` that would make depth
+    negative is the function's opening brace.  That brace is the last ``{``
+    whose level equals the level at the scan start, so it is found with one
+    bisect in the brace index.  Braces inside literals and comments are
+    not part of the index.
 
     Args:
-        lines: List of file lines
+        text: Complete file content
+        offsets: Line start offsets from _line_offsets()
+        brace_index: Code brace index from _index_braces()
         from_line: Index to start searching backwards from (0-indexed)
 
     Returns:
         Index of the first line of the function (signature), or None
     """
-    depth = 0
+    braces, levels, by_level = brace_index
     func_brace_line = None
 
-    for i in range(from_line, -1, -1):
-        for char in reversed(lines[i]):
-            if char == "}":
-                depth += 1
-            elif char == "{":
-                if depth > 0:
-                    depth -= 1
-                else:
-                    func_brace_line = i
-                    break
-        if func_brace_line is not None:
-            break
+    last = bisect_left(braces, _line_end(text, offsets, from_line)) - 1
+    if last >= 0:
+        candidates = by_level.get(("{", levels[last]), [])
+        found = bisect_right(candidates, last) - 1
+        if found >= 0:
+            func_brace_line = _line_at(offsets, braces[candidates[found]])
 
     if func_brace_line is None:
         return None
@@ -94,44 +255,52 @@ def _find_function_start(lines: list[str], from_line: int) -> Optional[int]:
     # Stop at an empty line, end of previous function, or preprocessor directive.
     func_start = func_brace_line
     while func_start > 0:
-        prev = lines[func_start - 1].strip()
-        if not prev or prev == "}" or prev.startswith("#"):
+        if _SIGNATURE_STOP_RE.match(text, offsets[func_start - 1], offsets[func_start]):
             break
         func_start -= 1
 
     return func_start
 
 
-def _find_function_end(lines: list[str], start_line: int) -> Optional[int]:
+def _find_function_end(
+    text: str, offsets: list[int], brace_index: _BraceIndex, start_line: int
+) -> Optional[int]:
     """
     Find the end of a function by counting braces from the start.
 
+    Counting from the first brace of the function, the end is the first
+    ``}`` after an opening ``{`` that brings the count back to zero, i.e.
+    the first ``}`` at the level the count started from.  It is found with
+    one bisect in the brace index.  Braces inside literals and comments are
+    not part of the index.
+
     Args:
-        lines: List of file lines
+        text: Complete file content
+        offsets: Line start offsets from _line_offsets()
+        brace_index: Code brace index from _index_braces()
         start_line: Index where the function starts (0-indexed)
 
     Returns:
         Index of the line where the function ends, or None
     """
-    brace_count = 0
-    found_opening = False
+    braces, levels, by_level = brace_index
 
-    for i in range(start_line, len(lines)):
-        line = lines[i]
+    first = bisect_left(braces, offsets[start_line])
+    base_level = levels[first - 1] if first > 0 else 0
 
-        # Count braces
-        for char in line:
-            if char == "{":
-                brace_count += 1
-                found_opening = True
-            elif char == "}":
-                brace_count -= 1
+    # The count only matters once an opening brace has been seen
+    opening = first
+    while opening < len(braces) and text[braces[opening]] != "{":
+        opening += 1
+    if opening == len(braces):
+        return None
 
-                # Function ends when braces balance
-                if found_opening and brace_count == 0:
-                    return i
+    candidates = by_level.get(("}", base_level), [])
+    found = bisect_right(candidates, opening)
+    if found == len(candidates):
+        return None
 
-    return None
+    return _line_at(offsets, braces[candidates[found]])
 
 
 def extract_call_stack(stack_frames: list[StackFrame]) -> list[ExtractedFunction]:
@@ -156,13 +325,27 @@ def extract_call_stack(stack_frames: list[StackFrame]) -> list[ExtractedFunction
     """
     extracted = []
 
+    # Load every distinct source file up front, concurrently
+    _preload_sources(
+        frame["file"]
+        for frame in stack_frames
+        if frame.get("file") and not _is_system_file(frame["file"])
+    )
+
     # Process frames in reverse order (from main to problem)
+    previous_location = None
+    code = None
+
     for frame in reversed(stack_frames):
         # Skip system functions (no file path or in system directories)
         if not frame.get("file") or _is_system_file(frame["file"]):
             continue
 
-        code = extract_function(frame["file"], frame["line"])
+        # Consecutive frames at the same location (recursion) share the code
+        location = (frame["file"], frame["line"])
+        if location != previous_location:
+            code = extract_function(frame["file"], frame["line"])
+            previous_location = location
 
         if code:
             extracted.append(
@@ -177,6 +360,31 @@ def extract_call_stack(stack_frames: list[StackFrame]) -> list[ExtractedFunction
     return extracted
 
 
+def _preload_sources(filepaths: Iterable[str]) -> None:
+    """
+    Read the distinct source files of a call stack into the cache at once.
+
+    File reads release the GIL, so a small thread pool lets the kernel
+    service cold-cache reads in parallel instead of one frame at a time.
+    Files that are missing or already cached are left to extract_function.
+
+    Args:
+        filepaths: Source paths referenced by the stack frames
+    """
+    pending = []
+    for filepath in set(filepaths):
+        key = _cache_key(filepath)
+        if key is not None and key not in _file_cache:
+            pending.append((filepath, key))
+
+    if len(pending) < 2:
+        return
+
+    with ThreadPoolExecutor(max_workers=min(8, len(pending))) as pool:
+        for filepath, key in pending:
+            pool.submit(_load_source, filepath, key)
+
+
 def _is_system_file(filepath: str) -> bool:
     """
     Check if a file is a system file (libc, standard library, etc).
@@ -187,14 +395,14 @@ def _is_system_file(filepath: str) -> bool:
     Returns:
         True if it's a system file to skip
     """
-    system_paths = ["/usr/include/", "/usr/lib/", "libc", "libpthread"]
-    return any(path in filepath for path in system_paths)
+    return _SYSTEM_FILE_RE.search(filepath) is not None
 
 
 def _find_source_file(filename: str) -> Optional[str]:
     """
     Search for source file by intelligently traversing directory tree.
     Finds project root first, then searches recursively from there.
+    Results (including misses) are cached per basename.
 
     Args:
         filename: Name of the file to find (e.g., "push_swap_utils.c")
@@ -202,11 +410,11 @@ def _find_source_file(filename: str) -> Optional[str]:
     Returns:
         Full path to the file if found, None otherwise
     """
-    import subprocess
-    import os
-
     basename = os.path.basename(filename)
 
+    if basename in _source_file_cache:
+        return _source_file_cache[basename]
+
     # Project markers that indicate root directory
     project_markers = ["Makefile", "CMakeLists.txt", "src", "include", ".git"]
 
@@ -233,30 +441,54 @@ def _find_source_file(filename: str) -> Optional[str]:
     # Determine best search starting point
     search_root = find_project_root(os.getcwd())
 
-    # Build list of paths to search
-    search_paths = [search_root]
+    found = _scan_for_file(search_root, basename)
+    _source_file_cache[basename] = found
+    return found
 
-    # Add common source directories if they exist
-    for common_dir in ["src", "source", "sources", "lib", "include"]:
-        candidate_path = os.path.join(search_root, common_dir)
-        if os.path.exists(candidate_path) and os.path.isdir(candidate_path):
-            search_paths.append(candidate_path)
 
-    # Search in each path
-    for search_path in search_paths:
-        try:
-            result = subprocess.run(
-                ["find", search_path, "-name", basename, "-type", "f"],
-                capture_output=True,
-                text=True,
-                timeout=2,
-            )
+def _scan_for_file(search_root: str, basename: str) -> Optional[str]:
+    """
+    Depth-first, in-process search for a file, stopping at the first match.
+
+    Hidden directories and build/dependency directories are skipped, and
+    the walk gives up after _SEARCH_TIMEOUT seconds on very large trees.
+
+    Args:
+        search_root: Directory to start from
+        basename: File name to look for
 
-            if result.returncode == 0 and result.stdout.strip():
-                return result.stdout.strip().split("\n")[0]
-        except (subprocess.TimeoutExpired, subprocess.SubprocessError):
+    Returns:
+        Full path to the first match, or None
+    """
+    deadline = time.monotonic() + _SEARCH_TIMEOUT
+    pending = [search_root]
+
+    while pending:
+        if time.monotonic() > deadline:
+            return None
+
+        directory = pending.pop()
+        subdirs = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not (
+                                entry.name.startswith(".")
+                                or entry.name in _SKIPPED_DIRS
+                            ):
+                                subdirs.append(entry.path)
+                        elif entry.name == basename and entry.is_file():
+                            return entry.path
+                    except OSError:
+                        continue
+        except OSError:
             continue
 
+        # Reversed so that directories are visited in listing order
+        pending.extend(reversed(subdirs))
+
     return None
 
 
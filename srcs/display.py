@@ -7,9 +7,11 @@ Formats and displays analysis results in the terminal.
 import os
 import re
 import sys
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
 from typing import Optional
 
-from code_extractor import _find_source_file
+from code_extractor import _cache_key, _find_source_file
 from colors import (
     RESET,
     GREEN,
@@ -21,6 +23,34 @@ from colors import (
     GRAY,
 )
 from type_defs import ValgrindError, MistralAnalysis, RealCause, CleanedCodeLines
+from welcome import clear_screen
+
+# Stripped line → ascending line numbers, per (absolute path, mtime) of a
+# source.  Every code snippet of every leak in the same file is a dict lookup.
+_line_index_cache: dict[tuple[str, float], dict[str, list[int]]] = {}
+
+# Fixed part of the per-leak header, formatted once
+_HEADER_TEMPLATE = "\n\033[38;5;224m│ Leax Analysis\n│ "
+
+# "N:" prefix of a line from code_extractor.extract_function
+_LINE_NUMBER_RE = re.compile(r"(\d+):")
+
+# Label shown for each Mistral leak_type
+_LEAK_TYPE_LABELS = {
+    1: "Memory was never freed",
+    2: "Pointer was lost before freeing memory",
+    3: "No pointer can access this memory anymore",
+}
+
+# Fixed section titles, formatted once
+_DIAGNOSIS_TITLE = f"{GREEN}• Diagnosis{RESET}\n\n"
+_MEMORY_TRACE_TITLE = f"{GREEN}• Memory Trace{RESET}\n\n"
+_ROOT_CAUSE_TITLE = f"{GREEN}• Root Cause{RESET}\n\n"
+_SOLUTION_TITLE = f"{GREEN}• Proposed Solution{RESET}\n\n"
+_ROOT_CAUSE_NOT_FOUND = (
+    f"{_ROOT_CAUSE_TITLE}"
+    f"{LIGHT_YELLOW}Impossible de localiser le code source.{RESET}\n\n"
+)
 
 
 def _build_header(error_number: int, total_errors: int) -> str:
@@ -35,11 +65,7 @@ def _build_header(error_number: int, total_errors: int) -> str:
         Formatted header with ANSI colors
     """
 
-    leak_text = f"Leak {error_number} / {total_errors}"
-
-    header = f"\n\033[38;5;224m│ Leax Analysis\n│ {leak_text}{RESET}\n"
-
-    return header
+    return f"{_HEADER_TEMPLATE}Leak {error_number} / {total_errors}{RESET}\n"
 
 
 def _build_valgrind_section(error: ValgrindError) -> str:
@@ -53,29 +79,30 @@ def _build_valgrind_section(error: ValgrindError) -> str:
         Formatted section with ANSI colors
     """
 
-    output = ""
+    parts = []
 
     # First line with complete info
-    bytes_info = f"{error.get('bytes', '?')} bytes"
-    if error.get("blocks"):
-        bytes_info += f" in {error['blocks']} blocks"
-    bytes_info += f" are {error.get('type', 'unknown')}"
-
-    output += f"{LIGHT_YELLOW}{bytes_info}\n"
+    blocks = error.get("blocks")
+    blocks_info = f" in {blocks} blocks" if blocks else ""
+    parts.append(
+        f"{LIGHT_YELLOW}{error.get('bytes', '?')} bytes{blocks_info}"
+        f" are {error.get('type', 'unknown')}\n"
+    )
 
     # Malloc line (system) - use captured one or fallback
     allocation = error.get("allocation_line", "    at malloc (system allocator)")
-    output += f"{allocation}\n"
+    parts.append(f"{allocation}\n")
 
     # Backtrace in Valgrind order (allocation → main)
     if error.get("backtrace"):
-        backtrace_reversed = list(reversed(error["backtrace"]))
-        for frame in backtrace_reversed:
-            output += f"    by {frame.get('function', '?')} ({frame.get('file', '?')}:{frame.get('line', '?')})\n"
+        parts.extend(
+            f"    by {frame.get('function', '?')} ({frame.get('file', '?')}:{frame.get('line', '?')})\n"
+            for frame in reversed(error["backtrace"])
+        )
 
-    output += f"{RESET}\n"
+    parts.append(f"{RESET}\n")
 
-    return output
+    return "".join(parts)
 
 
 def _build_analysis_section(analysis: MistralAnalysis) -> str:
@@ -89,25 +116,19 @@ def _build_analysis_section(analysis: MistralAnalysis) -> str:
         Formatted section with ANSI colors
     """
 
-    leak_type_labels = {
-        1: "Memory was never freed",
-        2: "Pointer was lost before freeing memory",
-        3: "No pointer can access this memory anymore",
-    }
-
     # Title
-    output = f"{GREEN}• Diagnosis{RESET}\n\n"
+    parts = [_DIAGNOSIS_TITLE]
 
     # Leak type
     leak_type = analysis.get("leak_type", 0)
-    if leak_type in leak_type_labels:
-        output += f"{DARK_YELLOW} ➤ {leak_type_labels[leak_type]}{RESET}\n\n"
+    if leak_type in _LEAK_TYPE_LABELS:
+        parts.append(f"{DARK_YELLOW} ➤ {_LEAK_TYPE_LABELS[leak_type]}{RESET}\n\n")
 
     # diagnosis
     diagnosis = analysis.get("diagnosis", "No diagnosis available")
-    output += f"{LIGHT_YELLOW}{diagnosis}{RESET}\n\n"
+    parts.append(f"{LIGHT_YELLOW}{diagnosis}{RESET}\n\n")
 
-    return output
+    return "".join(parts)
 
 
 def _build_reasoning_section(analysis: MistralAnalysis) -> str:
@@ -127,20 +148,26 @@ def _build_reasoning_section(analysis: MistralAnalysis) -> str:
         return ""
 
     # Title
-    output = f"{GREEN}• Memory Trace{RESET}\n\n"
+    parts = [_MEMORY_TRACE_TITLE]
 
-    # Each step
+    # Each step (colors are foreground only: one reset after the last step)
     for i, etape in enumerate(reasoning, 1):
-        output += f"{DARK_YELLOW} {i}{DARK_YELLOW} ➤ {LIGHT_YELLOW}{etape}{RESET}\n"
+        parts.append(f"{DARK_YELLOW} {i} ➤ {LIGHT_YELLOW}{etape}\n")
 
-    output += "\n"
+    parts.append(f"{RESET}\n")
 
-    return output
+    return "".join(parts)
 
 
-def _find_line_number(filepath: str, code_to_find: str) -> Optional[int]:
+def _load_line_index(filepath: str) -> Optional[dict[str, list[int]]]:
     """
-    Searches for the line number of code in a source file.
+    Index the lines of a source file, read once per version of the file.
+
+    Args:
+        filepath: Source file path (resolved with _find_source_file)
+
+    Returns:
+        Stripped line → ascending line numbers, or None if unreadable
     """
     # Use the robust search from code_extractor
     found_path = _find_source_file(filepath)
@@ -148,19 +175,73 @@ def _find_line_number(filepath: str, code_to_find: str) -> Optional[int]:
     if not found_path:
         return None
 
-    try:
-        with open(found_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-    except (IOError, UnicodeDecodeError):
+    key = _cache_key(found_path)
+    if key is None:
         return None
 
+    if key not in _line_index_cache:
+        try:
+            # One read and one split; "\n" only, so numbering matches the
+            # editor even with form feeds in the source
+            with open(found_path, "r", encoding="utf-8") as f:
+                lines = f.read().split("\n")
+        except (IOError, UnicodeDecodeError):
+            return None
+
+        index: dict[str, list[int]] = {}
+        for i, line in enumerate(lines, start=1):
+            stripped = line.strip()
+            # Blank lines are never looked up (empty code is rejected)
+            if stripped:
+                index.setdefault(stripped, []).append(i)
+        _line_index_cache[key] = index
+
+    return _line_index_cache[key]
+
+
+def _find_line_number(
+    filepath: str,
+    code_to_find: str,
+    before: Optional[int] = None,
+    after: Optional[int] = None,
+) -> Optional[int]:
+    """
+    Searches for the line number of code in a source file.
+
+    When the code appears several times, the first occurrence is returned,
+    or the one closest to the given bound.
+
+    Args:
+        filepath: Source file path
+        code_to_find: Code of the line (compared stripped)
+        before: Only consider lines strictly before this one
+        after: Only consider lines strictly after this one
+
+    Returns:
+        Line number, or None if not found
+    """
+    # Empty code would match any blank line
     code_clean = code_to_find.strip()
+    if not code_clean:
+        return None
+
+    index = _load_line_index(filepath)
+    if index is None:
+        return None
+
+    line_numbers = index.get(code_clean)
+    if not line_numbers:
+        return None
+
+    if before is not None:
+        pos = bisect_left(line_numbers, before)
+        return line_numbers[pos - 1] if pos else None
 
-    for i, line in enumerate(lines, start=1):
-        if line.strip() == code_clean:
-            return i
+    if after is not None:
+        pos = bisect_right(line_numbers, after)
+        return line_numbers[pos] if pos < len(line_numbers) else None
 
-    return None
+    return line_numbers[0]
 
 
 def _clean_and_sort_code_lines(
@@ -179,7 +260,8 @@ def _clean_and_sort_code_lines(
     """
     # 1. Find root_cause line number
     root_code = cause.get("root_cause_code", "")
-    root_line = _find_line_number(source_file, root_code)
+    root_code_stripped = root_code.strip()
+    root_line = _find_line_number(source_file, root_code_stripped)
 
     if not root_line:
         return None
@@ -196,13 +278,14 @@ def _clean_and_sort_code_lines(
             continue
 
         # Ignore if equal to root_cause
-        if code == root_code.strip():
+        if code == root_code_stripped:
             continue
 
-        line_num = _find_line_number(source_file, code)
+        # Occurrence closest to root_cause, before it
+        line_num = _find_line_number(source_file, code, before=root_line)
 
-        # Ignore if not found or after root_cause
-        if not line_num or line_num >= root_line:
+        # Ignore if not found before root_cause
+        if not line_num:
             continue
 
         seen_codes.add(code)
@@ -211,7 +294,7 @@ def _clean_and_sort_code_lines(
         )
 
     # Sort by ascending line number
-    contributing.sort(key=lambda x: x["line"])
+    contributing.sort(key=itemgetter("line"))
 
     # 3. Process context_before
     context_before = None
@@ -221,12 +304,14 @@ def _clean_and_sort_code_lines(
         # Ignore if already in contributing or equal to root
         if (
             context_before_code not in seen_codes
-            and context_before_code != root_code.strip()
+            and context_before_code != root_code_stripped
         ):
-            ctx_line = _find_line_number(source_file, context_before_code)
-
             # Must be before root_cause
-            if ctx_line and ctx_line < root_line:
+            ctx_line = _find_line_number(
+                source_file, context_before_code, before=root_line
+            )
+
+            if ctx_line:
                 context_before = {"line": ctx_line, "code": context_before_code}
 
     # 4. Process context_after
@@ -237,12 +322,14 @@ def _clean_and_sort_code_lines(
         # Ignore if already seen or equal to root
         if (
             context_after_code not in seen_codes
-            and context_after_code != root_code.strip()
+            and context_after_code != root_code_stripped
         ):
-            ctx_line = _find_line_number(source_file, context_after_code)
-
             # Must be after root_cause
-            if ctx_line and ctx_line > root_line:
+            ctx_line = _find_line_number(
+                source_file, context_after_code, after=root_line
+            )
+
+            if ctx_line:
                 context_after = {"line": ctx_line, "code": context_after_code}
 
     return {
@@ -287,7 +374,7 @@ def _build_code_section(error: ValgrindError, analysis: MistralAnalysis) -> str:
                     last_line = code_lines[-1]  # "127: }"
 
                     # Extract number: "127: }" → 127
-                    match = re.match(r"(\d+):", last_line)
+                    match = _LINE_NUMBER_RE.match(last_line)
                     if match:
                         line_num = int(match.group(1))
 
@@ -323,25 +410,17 @@ def _build_code_section(error: ValgrindError, analysis: MistralAnalysis) -> str:
                         "context_after": None,
                     }
             if not cleaned:
-                output = f"{GREEN}• Root Cause{RESET}\n\n"
-                output += (
-                    f"{LIGHT_YELLOW}Impossible de localiser le code source.{RESET}\n\n"
-                )
-                return output
+                return _ROOT_CAUSE_NOT_FOUND
     else:
         # NORMAL CASE: call _clean_and_sort_code_lines()
         source_file = cause.get("file", error.get("file", "unknown"))
         cleaned = _clean_and_sort_code_lines(source_file, cause)
 
         if not cleaned:
-            output = f"{GREEN}• Root Cause{RESET}\n\n"
-            output += (
-                f"{LIGHT_YELLOW}Impossible de localiser le code source.{RESET}\n\n"
-            )
-            return output
+            return _ROOT_CAUSE_NOT_FOUND
 
     # Title
-    output = f"{GREEN}• Root Cause{RESET}\n\n"
+    parts = [_ROOT_CAUSE_TITLE]
 
     # Get source file
     source_file = cause.get("file", error.get("file", "unknown"))
@@ -349,47 +428,45 @@ def _build_code_section(error: ValgrindError, analysis: MistralAnalysis) -> str:
     # File and function
     display_function = cause.get("function", error.get("function", "unknown"))
 
-    output += f"{LIGHT_YELLOW}File     : {source_file}:{cleaned['root_line']}\n"
-    output += f"Function : {display_function}(){RESET}\n\n"
+    parts.append(f"{LIGHT_YELLOW}File     : {source_file}:{cleaned['root_line']}\n")
+    parts.append(f"Function : {display_function}(){RESET}\n\n")
 
     # Build ordered list of all lines to display
+    # Each line is a (line, code, comment, is_root) tuple
     lines_to_display = []
 
     # root_cause
     lines_to_display.append(
-        {
-            "line": cleaned["root_line"],
-            "code": cleaned["root_code"],
-            "comment": cleaned["root_comment"],
-            "is_root": True,
-        }
+        (cleaned["root_line"], cleaned["root_code"], cleaned["root_comment"], True)
     )
 
     # Display with gap detection
-    for i, item in enumerate(lines_to_display):
+    prev_line = None
+    for line, code, comment, is_root in lines_to_display:
         # Display "-" if gap detected
-        if i > 0:
-            prev_line = lines_to_display[i - 1]["line"]
-            curr_line = item["line"]
-            if curr_line - prev_line > 1:
-                output += f"      {GRAY}-{RESET}\n"
+        if prev_line is not None and line - prev_line > 1:
+            parts.append(f"      {GRAY}-{RESET}\n")
+        prev_line = line
 
         # Display line
-        if item["is_root"]:
-            output += f"{DARK_PINK} ➤ {item['line']} | {item['code']}{RESET}"
-            if item["comment"]:
-                output += f"  {GRAY}// {item['comment']}{RESET}"
-            output += "\n"
+        if is_root:
+            # Comment color switches directly, no reset in between
+            if comment:
+                parts.append(
+                    f"{DARK_PINK} ➤ {line} | {code}  {GRAY}// {comment}{RESET}\n"
+                )
+            else:
+                parts.append(f"{DARK_PINK} ➤ {line} | {code}{RESET}\n")
         else:
             # Normal line
-            output += f"   {item['line']} | {item['code']}"
-            if item["comment"]:
-                output += f"  {GRAY}// {item['comment']}{RESET}"
-            output += "\n"
+            parts.append(f"   {line} | {code}")
+            if comment:
+                parts.append(f"  {GRAY}// {comment}{RESET}")
+            parts.append("\n")
 
-    output += "\n"
+    parts.append("\n")
 
-    return output
+    return "".join(parts)
 
 
 def _build_solution_section(analysis: MistralAnalysis) -> str:
@@ -403,16 +480,16 @@ def _build_solution_section(analysis: MistralAnalysis) -> str:
         Formatted section with ANSI colors
     """
 
-    output = f"{GREEN}• Proposed Solution{RESET}\n\n"
+    parts = [_SOLUTION_TITLE]
 
     resolution = analysis.get("resolution_principle", "No resolution proposed")
-    output += f"{LIGHT_YELLOW}{resolution}{RESET}\n\n"
+    parts.append(f"{LIGHT_YELLOW}{resolution}{RESET}\n\n")
 
     # Resolution code
     if analysis.get("resolution_code"):
-        output += f"{analysis['resolution_code']}\n\n"
+        parts.append(f"{analysis['resolution_code']}\n\n")
 
-    return output
+    return "".join(parts)
 
 
 def _build_explanations_section(analysis: MistralAnalysis) -> str:
@@ -426,13 +503,9 @@ def _build_explanations_section(analysis: MistralAnalysis) -> str:
         Formatted section with ANSI colors
     """
 
-    output = ""
-
     # Explanation content
     explanations = analysis.get("explanations", "No explanation available")
-    output += f"{LIGHT_YELLOW}{explanations}{RESET}\n"
-
-    return output
+    return f"{LIGHT_YELLOW}{explanations}{RESET}\n"
 
 
 def display_analysis(
@@ -452,36 +525,40 @@ def display_analysis(
         total_errors: Total number of errors
         show_details: If True, expand Valgrind output and Explanation sections
     """
-    print(_build_header(error_number, total_errors))
+    # Sections are collected and written in one go (single stdout write)
+    out = [_build_header(error_number, total_errors), "\n"]
 
+    # Followed by the title's own RESET: no reset of its own
     detail_hint = (
-        f"{GRAY}Press [d] to hide{RESET}"
-        if show_details
-        else f"{GRAY}Press [d] for details{RESET}"
+        f"{GRAY}Press [d] to hide" if show_details else f"{GRAY}Press [d] for details"
     )
 
-    print(f"{GREEN}• Valgrind Output {detail_hint}{RESET}\n")
+    out.append(f"{GREEN}• Valgrind Output {detail_hint}{RESET}\n\n")
     if show_details:
-        print(_build_valgrind_section(error))
+        out.append(f"{_build_valgrind_section(error)}\n")
 
     # If error in Mistral analysis
     if "error" in analysis:
-        print(f"Mistral error : {analysis['error']}")
-        if "raw" in analysis:
-            print(f"\nRaw response :\n{analysis['raw']}")
+        out.append(f"Mistral error : {analysis['error']}\n")
+        # Raw model output is debug data: only dump it when LEAX_DEBUG is set
+        if "raw" in analysis and os.environ.get("LEAX_DEBUG"):
+            out.append(f"\nRaw response :\n{analysis['raw']}\n")
+        sys.stdout.write("".join(out))
+        sys.stdout.flush()
         return
 
-    print(_build_analysis_section(analysis))
-
-    print(_build_reasoning_section(analysis))
-
-    print(_build_code_section(error, analysis))
+    out.append(f"{_build_analysis_section(analysis)}\n")
+    out.append(f"{_build_reasoning_section(analysis)}\n")
+    out.append(f"{_build_code_section(error, analysis)}\n")
+    out.append(f"{_build_solution_section(analysis)}\n")
 
-    print(_build_solution_section(analysis))
-
-    print(f"{GREEN}• Explanation {detail_hint}{RESET}\n")
+    out.append(f"{GREEN}• Explanation {detail_hint}{RESET}\n\n")
     if show_details:
-        print(_build_explanations_section(analysis))
+        out.append(f"{_build_explanations_section(analysis)}\n")
+
+    sys.stdout.write("".join(out))
+    # Shown in full now, not on the next newline or menu redraw
+    sys.stdout.flush()
 
 
 def display_leak_menu() -> str:
@@ -498,17 +575,15 @@ def display_leak_menu() -> str:
     while True:
         choice = input(DARK_GREEN + "leax > " + RESET).strip().lower()
         if choice in ("", "v", "verify"):
-            os.system("clear")
+            clear_screen()
             return "verify"
         elif choice in ("n", "next"):
-            os.system("clear")
+            clear_screen()
             return "skip"
         elif choice in ("q", "quit"):
-            os.system("clear")
+            clear_screen()
             return "quit"
         else:
-            print(RED + "Invalid choice." + RESET)
-            sys.stdout.write("\033[F")
-            sys.stdout.write("\033[F")
-            sys.stdout.write("\r" + " " * 80 + "\r")
+            # Message, back up to the prompt line and erase it: one write
+            sys.stdout.write(f"{RED}Invalid choice.{RESET}\n\033[F\033[F\r\033[K")
             sys.stdout.flush()
@@ -98,8 +98,8 @@ def check_gdb_available() -> bool:
     try:
         proc = subprocess.run(
             ["gdb", "--version"],
-            capture_output=True,
-            text=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
             timeout=5,
         )
         return proc.returncode == 0
@@ -151,6 +151,7 @@ def _generate_gdb_script(
 import gdb
 import json
 import os
+import re
 
 # ---------------------------------------------------------------------------
 # Parameters injected by Leax
@@ -167,29 +168,67 @@ TRACE_END   = {_TRACE_END!r}
 
 MAX_STEPS = 50000  # Safety limit to avoid infinite loops.
 
+INDEX_RE = re.compile(r'\\[([^\\]]+)\\]')  # Sub-expression inside [...].
+ASSIGNMENT_RE = re.compile(r'(?<![=!<>])=(?!=)')  # Same test as memory_tracker.
+SIMPLE_VAR_RE = re.compile(r'([A-Za-z_]\\w*)(?:\\[(\\d+)\\])?$')  # var or var[N].
+
+# ---------------------------------------------------------------------------
+# Quiet GDB: the trace loop issues thousands of step commands, none of
+# their banners or prompts are needed.
+# ---------------------------------------------------------------------------
+for _setting in (
+    "set pagination off",
+    "set confirm off",
+    "set verbose off",
+    "set print frame-info off",
+    "set print inferior-events off",
+    "set print thread-events off",
+):
+    try:
+        gdb.execute(_setting)
+    except gdb.error:
+        pass  # Setting unknown to this GDB version.
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
+# Frame data for the current stop.  Every command that can move the
+# inferior goes through _silent(), which empties it.
+_stop_cache = {{}}
+
+
+def _silent(command):
+    """Run a GDB command, discarding what it would print."""
+    _stop_cache.clear()
+    gdb.execute(command, from_tty=False, to_string=True)
+
+
 def current_function_name():
     """Return the name of the current function, or None."""
-    try:
-        frame = gdb.selected_frame()
-        return frame.name()
-    except gdb.error:
-        return None
+    if "function" not in _stop_cache:
+        try:
+            _stop_cache["function"] = gdb.selected_frame().name()
+        except gdb.error:
+            _stop_cache["function"] = None
+    return _stop_cache["function"]
 
 
 def current_source_info():
     """Return (filename, line_number) for the current execution point."""
-    try:
-        frame = gdb.selected_frame()
-        sal = frame.find_sal()
-        if sal.symtab:
-            return (sal.symtab.filename, sal.line)
-    except gdb.error:
-        pass
-    return (None, None)
+    if "source" not in _stop_cache:
+        _stop_cache["source"] = (None, None)
+        try:
+            sal = gdb.selected_frame().find_sal()
+            if sal.symtab:
+                _stop_cache["source"] = (sal.symtab.filename, sal.line)
+        except gdb.error:
+            pass
+    return _stop_cache["source"]
+
+
+# Answers of _path_is_user(): a trace visits few distinct files.
+_user_path_cache = {{}}
 
 
 def is_user_code():
@@ -203,6 +242,13 @@ def is_user_code():
     src_file, _ = current_source_info()
     if not src_file:
         return False
+    if src_file not in _user_path_cache:
+        _user_path_cache[src_file] = _path_is_user(src_file)
+    return _user_path_cache[src_file]
+
+
+def _path_is_user(src_file):
+    """Check on disk whether *src_file* belongs to the user project."""
     try:
         if os.path.isfile(src_file):
             return True
@@ -214,12 +260,33 @@ def is_user_code():
         return False
 
 
+# Lines of each user source file (None if unreadable), read once.
+_source_lines_cache = {{}}
+
+
+def source_line(src_file, line_num):
+    """Return line *line_num* of *src_file*, or None if it cannot be read."""
+    if src_file not in _source_lines_cache:
+        path = src_file
+        if not os.path.isfile(path):
+            path = os.path.basename(src_file)
+        try:
+            with open(path, encoding='utf-8') as f:
+                _source_lines_cache[src_file] = f.readlines()
+        except (OSError, UnicodeDecodeError):
+            _source_lines_cache[src_file] = None
+    lines = _source_lines_cache[src_file]
+    if lines is None or not 0 < line_num <= len(lines):
+        return None
+    return lines[line_num - 1]
+
+
 def free_arg_register():
     """Return the register holding the first argument to free().
 
     On x86-64 this is $rdi; on AArch64 it is $x0.
     """
-    arch_info = gdb.execute("show architecture", to_string=True)
+    arch_info = gdb.selected_frame().architecture().name()
     if "aarch64" in arch_info or "arm" in arch_info:
         return "$x0"
     return "$rdi"
@@ -241,10 +308,13 @@ def resolve_expression(expr):
         The expression with indices resolved, or the original
         expression if resolution fails.
     """
-    import re
+    if '[' not in expr:
+        return expr  # Nothing to resolve.
     resolved = expr
-    for match in re.finditer(r'\\[([^\\]]+)\\]', expr):
+    for match in INDEX_RE.finditer(expr):
         index_expr = match.group(1)
+        if index_expr.isdigit():
+            continue  # Already a constant index.
         try:
             val = int(gdb.parse_and_eval(index_expr))
             resolved = resolved.replace(
@@ -272,6 +342,17 @@ def check_addr_intact(resolved_expr, tracked_addr):
     """
     if not resolved_expr or tracked_addr is None:
         return None
+    # ``var`` or ``var[N]``: read the variable from the frame instead of
+    # running GDB's expression parser.
+    match = SIMPLE_VAR_RE.match(resolved_expr)
+    if match:
+        try:
+            value = gdb.selected_frame().read_var(match.group(1))
+            if match.group(2):
+                value = value[int(match.group(2))]
+            return int(value) == tracked_addr
+        except (gdb.error, ValueError):
+            pass  # Not a local/global, or not an integer (e.g. an array).
     try:
         current = int(gdb.parse_and_eval(f"(long)({{resolved_expr}})"))
         return current == tracked_addr
@@ -279,6 +360,47 @@ def check_addr_intact(resolved_expr, tracked_addr):
         return None
 
 
+# memoryview formats for integer/pointer array elements, by size.
+ELEMENT_FORMATS = {{1: 'B', 2: 'H', 4: 'I', 8: 'Q'}}
+SCANNABLE_CODES = (gdb.TYPE_CODE_PTR, gdb.TYPE_CODE_INT, gdb.TYPE_CODE_CHAR)
+PAGE_SIZE = 4096
+
+
+def array_holds_address(ptr_val, tracked_addr):
+    """Check whether the array *ptr_val* points to holds *tracked_addr*.
+
+    Equivalent to comparing ``ptr_val[0]``, ``ptr_val[1]``... until the
+    memory becomes unreadable, but reads the inferior one page at a
+    time instead of evaluating every element through GDB.
+
+    Returns:
+        ``True`` or ``False``, or ``None`` if the elements are not
+        aligned integers/pointers (the caller then indexes them).
+    """
+    ptr_type = ptr_val.type.strip_typedefs()
+    if ptr_type.code != gdb.TYPE_CODE_PTR:
+        return None
+    elem_type = ptr_type.target().strip_typedefs()
+    size = elem_type.sizeof
+    addr = int(ptr_val)
+    if (elem_type.code not in SCANNABLE_CODES
+            or size not in ELEMENT_FORMATS
+            or addr % size):
+        return None
+
+    inferior = gdb.selected_inferior()
+    while True:
+        # Page-aligned reads: a page is either fully readable or not.
+        page_end = (addr // PAGE_SIZE + 1) * PAGE_SIZE
+        try:
+            chunk = inferior.read_memory(addr, page_end - addr)
+        except gdb.error:
+            return False
+        if tracked_addr in memoryview(chunk).cast(ELEMENT_FORMATS[size]):
+            return True
+        addr = page_end
+
+
 def scan_params_for_address(tracked_addr):
     """Scan the current function's parameters for *tracked_addr*.
 
@@ -312,6 +434,11 @@ def scan_params_for_address(tracked_addr):
                             continue
                         # Indirect match: dereference as array and check
                         # whether any element holds the tracked address.
+                        found = array_holds_address(val, tracked_addr)
+                        if found:
+                            mappings[sym.name] = tracked_addr
+                        if found is not None:
+                            continue
                         try:
                             idx = 0
                             while True:
@@ -331,26 +458,37 @@ def scan_params_for_address(tracked_addr):
         return {{}}
 
 
-def read_source_line_gdb(filepath, line_num):
-    """Read a single source line using GDB list command."""
+def read_source_range_gdb(filepath, start, end):
+    """Read source lines *start*..*end* with a single GDB list command.
+
+    Returns:
+        A dict mapping line numbers to their stripped source code
+        (empty if the lines cannot be listed).
+    """
+    lines = {{}}
     try:
         output = gdb.execute(
-            f"list {{filepath}}:{{line_num}},{{filepath}}:{{line_num}}",
+            f"list {{filepath}}:{{start}},{{filepath}}:{{end}}",
             to_string=True,
         )
-        for raw_line in output.strip().split('\\n'):
-            raw_line = raw_line.strip()
-            if raw_line and raw_line[0].isdigit():
-                parts = raw_line.split('\\t', 1)
-                if len(parts) >= 2:
-                    return parts[1].strip()
-                idx = 0
-                while idx < len(raw_line) and (raw_line[idx].isdigit() or raw_line[idx] == ' '):
-                    idx += 1
-                return raw_line[idx:].strip()
-        return ""
     except gdb.error:
-        return ""
+        return lines
+    for raw_line in output.strip().split('\\n'):
+        raw_line = raw_line.strip()
+        if not raw_line or not raw_line[0].isdigit():
+            continue
+        idx = 0
+        while idx < len(raw_line) and raw_line[idx].isdigit():
+            idx += 1
+        line_num = int(raw_line[:idx])
+        parts = raw_line.split('\\t', 1)
+        if len(parts) >= 2:
+            lines[line_num] = parts[1].strip()
+            continue
+        while idx < len(raw_line) and (raw_line[idx].isdigit() or raw_line[idx] == ' '):
+            idx += 1
+        lines[line_num] = raw_line[idx:].strip()
+    return lines
 
 
 # ---------------------------------------------------------------------------
@@ -367,24 +505,24 @@ def run_trace():
     #    function to reach the exact malloc call.  This disambiguates
     #    when the same function is called from multiple sites.
     if CALLER_FILE and CALLER_LINE:
-        gdb.execute(f"break {{CALLER_FILE}}:{{CALLER_LINE}}")
-        gdb.execute("run")
+        _silent(f"break {{CALLER_FILE}}:{{CALLER_LINE}}")
+        _silent("run")
         # Step into the allocation function to reach the malloc line.
-        gdb.execute("step")
+        _silent("step")
         # Now we should be inside the alloc function.  Step until we
         # reach the malloc line.
         for _attempt in range(20):
             src_file, src_line = current_source_info()
             if src_line == ALLOC_LINE:
                 break
-            gdb.execute("next")
+            _silent("next")
         # Execute the malloc line.
-        gdb.execute("next")
+        _silent("next")
     else:
-        gdb.execute(f"break {{ALLOC_FILE}}:{{ALLOC_LINE}}")
-        gdb.execute("run")
+        _silent(f"break {{ALLOC_FILE}}:{{ALLOC_LINE}}")
+        _silent("run")
         # Execute the malloc line.
-        gdb.execute("next")
+        _silent("next")
 
     # 2. Capture the allocated address and record the alloc line. ----------
 
@@ -417,12 +555,12 @@ def run_trace():
 
     # 3. Set a conditional breakpoint on free() for our address. ----------
     reg = free_arg_register()
-    gdb.execute(
+    _silent(
         f"break free if (long){{reg}} == (long){{tracked_address}}"
     )
 
     # 4. Delete the malloc breakpoint (no longer needed). -----------------
-    gdb.execute("delete 1")
+    _silent("delete 1")
 
     # 5. Step through the program, tracing relevant functions. ------------
     steps = 0
@@ -450,7 +588,10 @@ def run_trace():
                 and is_user_code()):
             ret_file, ret_line = current_source_info()
             if ret_file and ret_line and ret_line > 1:
-                cur_code = read_source_line_gdb(ret_file, ret_line)
+                nearby = read_source_range_gdb(
+                    ret_file, max(1, ret_line - 3), ret_line,
+                )
+                cur_code = nearby.get(ret_line, "")
                 current_is_call_site = (
                     cur_code and '=' in cur_code
                     and (prev_func + '(') in cur_code
@@ -460,7 +601,7 @@ def run_trace():
                         check_line = ret_line - offset
                         if check_line < 1:
                             break
-                        call_code = read_source_line_gdb(ret_file, check_line)
+                        call_code = nearby.get(check_line, "")
                         if call_code and '=' in call_code and (prev_func + '(') in call_code:
                             if (not trace
                                     or trace[-1]["line"] != check_line
@@ -503,7 +644,7 @@ def run_trace():
                     "caller_function": caller_func,
                 }})
             try:
-                gdb.execute("finish")
+                _silent("finish")
                 # Update prev_func so the return to the caller is not
                 # mistaken for a new function entry (avoids false scans).
                 prev_func = current_function_name() or prev_func
@@ -534,21 +675,25 @@ def run_trace():
                         pending_param_mapping = None
                     trace.append(entry)
             try:
-                gdb.execute("step")
+                _silent("step")
             except gdb.error:
                 break
             # Annotate the last recorded step with address integrity.
             # This check runs AFTER the step executes, so it tells us
             # whether the tracked address survived the executed line.
+            # Only assignments are checked: the memory tracker reads the
+            # flag for reassignments alone.
             if trace:
-                trace[-1]["addr_intact"] = check_addr_intact(
-                    resolved_expr, tracked_address,
-                )
+                code = source_line(trace[-1]["file"], trace[-1]["line"])
+                if code is None or ASSIGNMENT_RE.search(code):
+                    trace[-1]["addr_intact"] = check_addr_intact(
+                        resolved_expr, tracked_address,
+                    )
             continue
 
         # --- System/library code: skip it --------------------------------
         try:
-            gdb.execute("finish")
+            _silent("finish")
             prev_func = current_function_name() or prev_func
         except gdb.error:
             break
@@ -587,7 +732,8 @@ def emit_result(success, trace, tracked_address, free_events, error):
         "error": error,
     }}
     print(TRACE_BEGIN)
-    print(json.dumps(result))
+    # Compact separators: no blank after every ',' and ':' of the trace.
+    print(json.dumps(result, separators=(',', ':')))
     print(TRACE_END)
 
 
@@ -615,38 +761,63 @@ def _run_gdb(executable: str, script_content: str) -> Optional[str]:
 
     Args:
         executable:     Path to the target binary.
-        script_content: Python script to pass via ``-x``.
+        script_content: Python script run by GDB's embedded interpreter.
 
     Returns:
-        Combined stdout+stderr from GDB, or ``None`` on failure.
+        GDB's stdout (where the trace payload is printed), or ``None``
+        on failure.
     """
     script_fd = None
     script_path = None
 
     try:
-        # Write script to a temporary file.
-        script_fd, script_path = tempfile.mkstemp(suffix=".py", prefix="leax_gdb_")
-        with os.fdopen(script_fd, "w") as f:
-            f.write(script_content)
-        script_fd = None  # Ownership transferred to the with-block.
+        if hasattr(os, "memfd_create"):
+            # Linux: keep the script in memory and hand the fd to GDB.
+            # Reopening /proc/self/fd/N reads it from the start; the path
+            # has no .py suffix, so it is run with an explicit exec().
+            # GDB closes the fd before running the script, so the traced
+            # program does not inherit it (its fd numbers stay unchanged).
+            script_fd = os.memfd_create("leax_gdb", os.MFD_CLOEXEC)
+            os.write(script_fd, script_content.encode("utf-8"))
+            load_script = [
+                "-ex",
+                "python import os; "
+                f"_leax_script = open('/proc/self/fd/{script_fd}').read(); "
+                f"os.close({script_fd}); "
+                "exec(_leax_script)",
+            ]
+            pass_fds = (script_fd,)
+        else:
+            # Write script to a temporary file.
+            script_fd, script_path = tempfile.mkstemp(suffix=".py", prefix="leax_gdb_")
+            with os.fdopen(script_fd, "w") as f:
+                f.write(script_content)
+            script_fd = None  # Ownership transferred to the with-block.
+            load_script = ["-x", script_path]  # Load our script.
+            pass_fds = ()
 
         command = [
             "gdb",
             "--batch",  # Exit after script completes.
             "--quiet",  # Suppress banner.
-            "-x",
-            script_path,  # Load our script.
+            "-iex",
+            "set debuginfod enabled off",  # No network symbol downloads.
+            *load_script,
             executable,
         ]
 
+        # stderr (GDB warnings, the program's own errors) never holds
+        # the payload: it is discarded rather than captured and appended.
         proc = subprocess.run(
             command,
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
             text=True,
             timeout=60,
+            pass_fds=pass_fds,
         )
 
-        return proc.stdout + proc.stderr
+        return proc.stdout
 
     except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
         return None
@@ -668,19 +839,23 @@ def _parse_trace_output(raw_output: str) -> Optional[GdbTraceResult]:
     Extract the JSON payload emitted between sentinel markers.
 
     Args:
-        raw_output: Raw stdout+stderr captured from GDB.
+        raw_output: Raw stdout captured from GDB.
 
     Returns:
         Parsed ``GdbTraceResult``, or ``None`` if markers are missing or
         the JSON is malformed.
     """
     begin_idx = raw_output.find(_TRACE_BEGIN)
-    end_idx = raw_output.find(_TRACE_END)
+    if begin_idx == -1:
+        return None
 
-    if begin_idx == -1 or end_idx == -1 or end_idx <= begin_idx:
+    # The end marker is searched only after the payload start
+    json_start = begin_idx + len(_TRACE_BEGIN)
+    end_idx = raw_output.find(_TRACE_END, json_start)
+    if end_idx == -1:
         return None
 
-    json_str = raw_output[begin_idx + len(_TRACE_BEGIN) : end_idx].strip()
+    json_str = raw_output[json_start:end_idx].strip()
 
     try:
         data = json.loads(json_str)
@@ -703,6 +878,12 @@ def _parse_trace_output(raw_output: str) -> Optional[GdbTraceResult]:
 
 _source_cache: dict[str, list[str]] = {}
 
+# basename -> path of its first occurrence under the CWD, built on first use
+_basename_index: Optional[dict[str, str]] = None
+
+# Deepest directory level (below the CWD) searched for source files
+_MAX_SEARCH_DEPTH = 5
+
 
 def _read_source_line(filepath: str, line_number: int) -> str:
     """
@@ -742,7 +923,8 @@ def _find_file_by_name(basename: str) -> Optional[str]:
     """
     Search for a file by name starting from the current working directory.
 
-    Walks the directory tree up to 5 levels deep.
+    The directory tree (up to 5 levels deep) is walked once; later
+    lookups use the resulting basename index.
 
     Args:
         basename: Filename to search for (e.g. ``"leaky.c"``).
@@ -750,14 +932,19 @@ def _find_file_by_name(basename: str) -> Optional[str]:
     Returns:
         Absolute path if found, ``None`` otherwise.
     """
-    for root, _dirs, files in os.walk(os.getcwd()):
-        # Limit search depth.
-        depth = root.replace(os.getcwd(), "").count(os.sep)
-        if depth > 5:
-            continue
-        if basename in files:
-            return os.path.join(root, basename)
-    return None
+    global _basename_index
+
+    if _basename_index is None:
+        _basename_index = {}
+        cwd = os.getcwd()
+        for root, dirs, files in os.walk(cwd):
+            depth = root.replace(cwd, "").count(os.sep)
+            if depth >= _MAX_SEARCH_DEPTH:
+                dirs[:] = []  # Limit search depth.
+            for name in files:
+                _basename_index.setdefault(name, os.path.join(root, name))
+
+    return _basename_index.get(basename)
 
 
 def _resolve_trace_code(trace: list[TraceStep]) -> None:
@@ -5,6 +5,7 @@ Memory tracking algorithm to find root cause of memory leaks.
 Analyzes code execution flow and tracks memory ownership.
 """
 
+import re
 from typing import Optional
 
 from type_defs import (
@@ -16,6 +17,9 @@ from type_defs import (
     FreeEvent,
 )
 
+# Standalone '=' (not part of ==, !=, <= or >=).
+_ASSIGNMENT_RE = re.compile(r"(?<![=!<>])=(?!=)")
+
 # =============================================================================
 # UTILITY FUNCTIONS
 # =============================================================================
@@ -36,25 +40,15 @@ def build_segments(path: str) -> list[str]:
         Example: ``"head->next->data"`` → ``["head", "head->next",
         "head->next->data"]``
     """
-    import re
-
-    segments = []
-    # Split on ``->`` and ``[`` boundaries while keeping delimiters.
-    # This produces tokens like: ``["arr", "[i]", "->", "next"]``.
-    tokens = re.split(r"(->|\[)", path)
-
-    current = ""
-    for token in tokens:
-        if token == "->" or token == "[":
-            if current and current not in segments:
-                segments.append(current)
-            current += token
-        else:
-            current += token
-            # Close bracket if we opened one.
-
-    if current and current not in segments:
-        segments.append(current)
+    # One prefix ends before every ``->`` and ``[``; the full path closes
+    # the list.  Prefixes have distinct lengths, so none repeats.
+    segments = [
+        path[:i]
+        for i in range(1, len(path))
+        if path[i] == "[" or path.startswith("->", i)
+    ]
+    if path:
+        segments.append(path)
 
     # Ensure the root (without any accessor) is always present.
     root = extract_root(path)
@@ -125,13 +119,11 @@ def extract_left_side(line: str) -> str:
         Left-hand side variable name (e.g., "second", "head->next")
     """
 
-    left_part = line.split("=")[0].strip()
+    left_part = line.partition("=")[0].strip()
 
-    # If it's a declaration (Type *var), extract just var
+    # If it's a declaration (Type *var), extract just var (after the last *)
     if "*" in left_part:
-        # Find the last * and take what's after
-        last_star = left_part.rfind("*")
-        return left_part[last_star + 1 :].strip()
+        return left_part.rpartition("*")[2].strip()
 
     return left_part
 
@@ -146,7 +138,7 @@ def extract_right_side(line: str) -> str:
         Right-hand side value (e.g., "head->next", "NULL")
     """
 
-    right_part = line.split("=", 1)[1].replace(";", "").strip()
+    right_part = line.partition("=")[2].replace(";", "").strip()
     return right_part
 
 
@@ -210,7 +202,7 @@ def is_reassignment(line: str, found_segment: str) -> bool:
     if "=" not in line:
         return False
 
-    left_side = line.split("=")[0]
+    left_side = line.partition("=")[0]
     return found_segment in left_side
 
 
@@ -256,9 +248,7 @@ def find_segment_in_line(
     # Skip lines where '=' is part of a comparison (==, !=, <=, >=)
     # but not a real assignment.  A real assignment has a standalone '='
     # not preceded or followed by =, !, <, >.
-    import re
-
-    has_assignment = "=" in line and re.search(r"(?<![=!<>])=(?!=)", line)
+    has_assignment = "=" in line and _ASSIGNMENT_RE.search(line)
     if has_assignment:
         left = extract_left_side(line)
         right = extract_right_side(line)
@@ -4,9 +4,16 @@ Mistral AI analyzer wrapper for Leax integration.
 Adapts mistral_api.py for integration with leax main workflow.
 """
 
+import threading
+from typing import Optional
+
 from mistral_api import analyze_memory_leak
 from type_defs import ValgrindError, ExtractedFunction, MistralAnalysis
 
+# Lines kept around each frame's line in long functions (prompt size)
+_CONTEXT_BEFORE = 40
+_CONTEXT_AFTER = 40
+
 
 class MistralAPIError(Exception):
     """Raised when Mistral API call fails."""
@@ -43,6 +50,55 @@ def analyze_with_mistral(error_data: ValgrindError) -> MistralAnalysis:
         raise MistralAPIError(f"Analysis failed: {str(e)}")
 
 
+class PendingAnalysis:
+    """Mistral analysis running in a background thread."""
+
+    def __init__(self, error_data: ValgrindError) -> None:
+        self._analysis: Optional[MistralAnalysis] = None
+        self._error: Optional[MistralAPIError] = None
+        # Daemon: quitting Leax never waits for an unused analysis
+        self._thread = threading.Thread(
+            target=self._run, args=(error_data,), daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, error_data: ValgrindError) -> None:
+        try:
+            self._analysis = analyze_with_mistral(error_data)
+        except MistralAPIError as e:
+            self._error = e
+
+    def result(self) -> MistralAnalysis:
+        """
+        Wait for the analysis to finish.
+
+        Returns:
+            Structured analysis from Mistral AI.
+
+        Raises:
+            MistralAPIError: If API call failed.
+        """
+        self._thread.join()
+        if self._error:
+            raise self._error
+        return self._analysis
+
+
+def start_analysis(error_data: ValgrindError) -> PendingAnalysis:
+    """
+    Start analyzing a memory error with Mistral AI without waiting.
+
+    Lets the next leak be analyzed while the current one is displayed.
+
+    Args:
+        error_data: Valgrind error with backtrace, code context and root cause.
+
+    Returns:
+        Handle whose result() returns the analysis.
+    """
+    return PendingAnalysis(error_data)
+
+
 def _format_extracted_code(extracted_code: list[ExtractedFunction]) -> str:
     """Format extracted code from call stack for Mistral prompt.
 
@@ -68,7 +124,93 @@ def _format_extracted_code(extracted_code: list[ExtractedFunction]) -> str:
         formatted += f"Starts at line: {frame['line']}\n"
         formatted += f"Function ends: line {last_line_num}\n"
         formatted += f"{'=' * 50}\n"
-        formatted += frame["code"]
+        formatted += _strip_comment_lines(_window_code(frame["code"], frame["line"]))
         formatted += "\n\n"
 
     return formatted
+
+
+def _strip_comment_lines(code: str) -> str:
+    """Drop blank and comment-only lines from numbered function code.
+
+    Only whole lines are removed: a line holding code keeps its trailing
+    comment, so the lines Mistral quotes still match the source exactly
+    (display.py looks them up by content).  The "N: " prefixes of the
+    remaining lines and the "..." markers of _window_code() are untouched.
+
+    Args:
+        code: Function code from extract_function ("N: line" per line).
+
+    Returns:
+        The same code without lines the model does not need.
+    """
+
+    kept = []
+    in_comment = False
+
+    for numbered in code.splitlines(keepends=True):
+        if numbered.rstrip("\n") == "...":
+            # Elision marker from _window_code(), not a blank line
+            kept.append(numbered)
+            continue
+
+        content = numbered.partition(": ")[2].strip()
+
+        if in_comment:
+            # Inside a multi-line /* */: keep the line only if code follows
+            end = content.find("*/")
+            if end == -1:
+                continue
+            in_comment = False
+            if not content[end + 2 :].strip():
+                continue
+        elif not content or content.startswith("//"):
+            continue
+        elif content.startswith("/*"):
+            end = content.find("*/", 2)
+            if end == -1:
+                in_comment = True
+                continue
+            if not content[end + 2 :].strip():
+                continue
+
+        kept.append(numbered)
+
+    return "".join(kept)
+
+
+def _window_code(code: str, line: int) -> str:
+    """Keep the part of a long function around the frame's line.
+
+    The signature and the closing brace are always kept (a leak at the end
+    of scope is reported on the closing brace); elided ranges are replaced
+    by a "..." line.
+
+    Args:
+        code: Function code from extract_function ("N: line" per line).
+        line: Line of the frame inside this function.
+
+    Returns:
+        The code, windowed to [line - _CONTEXT_BEFORE, line + _CONTEXT_AFTER].
+    """
+
+    lines = code.splitlines(keepends=True)
+    if len(lines) <= _CONTEXT_BEFORE + _CONTEXT_AFTER + 3:
+        return code
+
+    first = line - _CONTEXT_BEFORE
+    last = line + _CONTEXT_AFTER
+
+    kept = [lines[0]]
+    elided = False
+    for numbered in lines[1:-1]:
+        number = numbered.partition(":")[0]
+        if number.isdigit() and first <= int(number) <= last:
+            kept.append(numbered)
+            elided = False
+        elif not elided:
+            kept.append("...\n")
+            elided = True
+    kept.append(lines[-1])
+
+    return "".join(kept)
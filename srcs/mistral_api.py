@@ -6,12 +6,61 @@ Sends memory leak analysis requests to Mistral AI and returns pedagogical explan
 
 import os
 import json
+import hashlib
+import random
+import time
 from typing import Optional
 
 from type_defs import ValgrindError, RootCauseInfo, MistralAnalysis
 
+# Keys every Mistral analysis must contain, checked in this order
+_REQUIRED_KEYS = (
+    "leak_type",
+    "diagnosis",
+    "reasoning",
+    "resolution_principle",
+    "resolution_code",
+    "explanations",
+)
+
+# Model settings, overridable with MISTRAL_MODEL / MISTRAL_MAX_TOKENS.
+# The JSON reply is about 1 KB: the token cap only cuts runaway answers.
+_DEFAULT_MODEL = "mistral-small-latest"
+_DEFAULT_MAX_TOKENS = 2048
+
+# Transient API failures (rate limit, server errors) are retried with
+# exponential backoff and jitter, at most _MAX_ATTEMPTS calls in total
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+_MAX_ATTEMPTS = 5
+_MAX_BACKOFF = 30.0
+
+# JSON mode: the API guarantees a bare JSON object (no markdown fences)
+_RESPONSE_FORMAT = "json_object"
+
+# Validated replies, keyed by hash of (model, messages).  Kept in memory for
+# the session and on disk so re-runs on unchanged code skip the API call.
+# LEAX_RESPONSE_CACHE=0 disables it; beyond _MAX_CACHED_RESPONSES files the
+# least recently used ones are deleted.
+_response_cache: dict[str, str] = {}
+_RESPONSE_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "leax", "mistral")
+_MAX_CACHED_RESPONSES = 500
+_STALE_TMP_AGE = 3600.0  # Seconds; younger temp files may be in use
+
 # Lazy-loaded client (mistralai import takes ~4s on ARM/Docker)
 _client = None
+_env_loaded = False
+
+
+def _load_env() -> None:
+    """Load .env once (API key and model overrides)."""
+    global _env_loaded
+    if _env_loaded:
+        return
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    _env_loaded = True
 
 
 def _get_client():
@@ -20,10 +69,9 @@ def _get_client():
     if _client is not None:
         return _client
 
-    from dotenv import load_dotenv
     from mistralai import Mistral
 
-    load_dotenv()
+    _load_env()
     api_key = os.environ.get("MISTRAL_API_KEY")
     if not api_key:
         raise ValueError(
@@ -34,26 +82,143 @@ def _get_client():
     return _client
 
 
-def _clean_json_response(response: str) -> str:
+def _env_int(name: str, default: int) -> int:
+    """
+    Read a positive integer from the environment.
+
+    Args:
+        name: Environment variable name.
+        default: Value used when unset or invalid.
+
+    Returns:
+        The integer value.
+    """
+    value = os.environ.get(name, "")
+    if value.isdigit() and int(value) > 0:
+        return int(value)
+    return default
+
+
+def _model_name() -> str:
+    """Model used for analyses (MISTRAL_MODEL, or the default)."""
+    _load_env()
+    return os.environ.get("MISTRAL_MODEL", _DEFAULT_MODEL)
+
+
+def _response_cache_key(prompt: str) -> str:
+    """
+    Identify a request by the model and the exact messages.
+
+    Args:
+        prompt: Complete prompt string.
+
+    Returns:
+        Hex digest used as cache key (and file name).
+    """
+    data = f"{_model_name()}\0{_RESPONSE_FORMAT}\0{_SYSTEM_PROMPT}\0{prompt}"
+    data = data.encode("utf-8")
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _response_cache_enabled() -> bool:
+    """Whether replies are cached (LEAX_RESPONSE_CACHE=0 turns it off)."""
+    _load_env()
+    return os.environ.get("LEAX_RESPONSE_CACHE", "1") != "0"
+
+
+def _get_cached_response(key: str) -> Optional[str]:
     """
-    Clean API response to extract pure JSON.
+    Look up a validated reply, in memory then on disk.
 
     Args:
-        response: Raw response string from Mistral API.
+        key: Value from _response_cache_key().
 
     Returns:
-        Cleaned JSON string ready for parsing.
+        The raw reply, or None on a miss (or when caching is disabled).
     """
+    if not _response_cache_enabled():
+        return None
 
-    response = response.strip()
+    if key in _response_cache:
+        return _response_cache[key]
 
-    if "```" in response:
-        start = response.find("{")
-        end = response.rfind("}")
-        if start != -1 and end != -1:
-            response = response[start : end + 1]
+    path = os.path.join(_RESPONSE_CACHE_DIR, f"{key}.json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            response = f.read()
+        # Mark as recently used (eviction removes the oldest mtimes)
+        os.utime(path)
+    except (OSError, UnicodeDecodeError):
+        return None
 
-    return response.strip()
+    _response_cache[key] = response
+    return response
+
+
+def _store_response(key: str, response: str) -> None:
+    """
+    Cache a reply that passed validation (best effort on disk).
+
+    Args:
+        key: Value from _response_cache_key().
+        response: Raw reply from Mistral.
+    """
+    if not _response_cache_enabled():
+        return
+
+    _response_cache[key] = response
+
+    path = os.path.join(_RESPONSE_CACHE_DIR, f"{key}.json")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(_RESPONSE_CACHE_DIR, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(response)
+        # Atomic: a concurrent run never reads a partial file
+        os.replace(tmp_path, path)
+    except OSError:
+        # Disk full...: do not leave a partial temp file behind
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return
+
+    _prune_response_cache()
+
+
+def _prune_response_cache() -> None:
+    """
+    Delete the least recently used replies beyond _MAX_CACHED_RESPONSES.
+
+    Temp files older than _STALE_TMP_AGE (left by a killed run) are
+    deleted too.
+    """
+    entries = []
+    stale_before = time.time() - _STALE_TMP_AGE
+    try:
+        with os.scandir(_RESPONSE_CACHE_DIR) as it:
+            for entry in it:
+                mtime = entry.stat().st_mtime
+                if entry.name.endswith(".json"):
+                    entries.append((mtime, entry.path))
+                elif entry.name.endswith(".tmp") and mtime < stale_before:
+                    try:
+                        os.remove(entry.path)
+                    except OSError:
+                        pass
+    except OSError:
+        return
+
+    if len(entries) <= _MAX_CACHED_RESPONSES:
+        return
+
+    entries.sort()
+    for _mtime, path in entries[: len(entries) - _MAX_CACHED_RESPONSES]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
 
 
 def analyze_memory_leak(
@@ -73,31 +238,28 @@ def analyze_memory_leak(
         Structured analysis or dict with 'error' field on failure.
     """
 
+    response = None
+
     try:
         prompt = _build_prompt(error_data, code_context, root_cause)
 
-        response = _call_mistral_api(prompt)
-
-        # Nettoie la réponse
-        cleaned = _clean_json_response(response)
+        # Same model and prompt (code unchanged since last run): reuse reply
+        cache_key = _response_cache_key(prompt)
+        response = _get_cached_response(cache_key)
+        if response is None:
+            response = _call_mistral_api(prompt)
 
-        # Parse le JSON
-        analysis = json.loads(cleaned)
+        # Parse le JSON (JSON mode: no markdown fences to strip)
+        analysis = json.loads(response)
 
         # Validation basique
-        required_keys = [
-            "leak_type",
-            "diagnosis",
-            "reasoning",
-            "resolution_principle",
-            "resolution_code",
-            "explanations",
-        ]
-
-        for key in required_keys:
+        for key in _REQUIRED_KEYS:
             if key not in analysis:
                 raise ValueError(f"Missing key: {key}")
 
+        # Only replies that parse and validate are worth replaying
+        _store_response(cache_key, response)
+
         # Injecter les données de root_cause dans la réponse
         if root_cause:
             analysis["leak_type"] = root_cause["type"]
@@ -114,7 +276,7 @@ def analyze_memory_leak(
     except json.JSONDecodeError as e:
         return {
             "error": f"Invalid JSON: {str(e)}",
-            "raw": response if "response" in locals() else "N/A",
+            "raw": response if response is not None else "N/A",
         }
     except Exception as e:
         return {"error": str(e)}
@@ -239,6 +401,100 @@ def _compress_trace(gdb_trace: list[dict]) -> list[dict]:
     return result
 
 
+# Leak type descriptions used in the root cause section of the prompt
+_ROOT_CAUSE_TYPE_LABELS = {
+    1: "Type 1: Memory was never freed",
+    2: "Type 2: Pointer was lost before freeing memory",
+    3: "Type 3: Container was freed before its content",
+}
+
+_ROOT_CAUSE_NOT_IDENTIFIED = """
+====================================================
+ROOT CAUSE
+====================================================
+
+Not identified (manual analysis required)
+"""
+
+# Instructions identical for every leak, sent as the system message.  The
+# request then always starts with the same bytes (server-side prefix reuse)
+# and only the leak-specific report travels in the user message.
+_SYSTEM_PROMPT = """You are a C and memory management expert. You must explain a memory leak in a pedagogical way.
+
+====================================================
+YOUR MISSION
+====================================================
+
+1. Explain the diagnosis in 2-3 clear sentences
+2. Provide step-by-step pedagogical reasoning (based on the memory path in the report)
+3. Identify important code lines (contributing_codes)
+4. Propose a solution with corrective code
+
+CRITICAL: If the report contains an execution trace, base your reasoning ONLY on the lines that were actually executed. A line that appears in the source code but NOT in the execution trace was NOT executed during this run. Do not assume it was.
+
+IMPORTANT RULES:
+- Use simple and pedagogical language
+- Reasoning must guide the user step by step
+- In "reasoning": no numbering, maximum 15 words per step
+- Don't copy raw steps, rephrase them in an understandable way
+- contributing_codes: only lines BEFORE root_cause_code
+- root_cause_comment: maximum 10 words
+- resolution_principle: mention function, action, and reference line
+- When the root cause is a closing brace (pointer lost at end of scope), the fix must be placed just before that closing brace, not earlier in the function
+- JSON only, no text around
+"""
+
+# Leak-specific part of the prompt, filled with str.format() by
+# _build_prompt.  JSON braces are doubled.
+_PROMPT_TEMPLATE = """====================================================
+VALGRIND REPORT
+====================================================
+
+{bytes} bytes in {blocks} blocks are {type}
+Allocation function: {function}()
+File: {file}
+Line: {line}
+{execution_trace_section}
+====================================================
+{source_code_label}
+====================================================
+
+{code_context}
+{root_cause_section}
+
+====================================================
+JSON FORMAT (only, no text around)
+====================================================
+
+{{
+  "leak_type": {leak_type},
+  "diagnosis": "<clear explanation of the problem in 2-3 sentences>",
+  "reasoning": [
+    "Transform each step from 'Memory path' above into a clear, factual sentence",
+    "Use real variable names, line numbers, and function names from the steps",
+    "Example: 'ALLOC: ptr in func()' becomes 'malloc() allocates memory for ptr in func()'",
+    "Keep it factual and descriptive, not pedagogical"
+  ],
+  "real_cause": {{
+    "file": "{cause_file}",
+    "function": "{cause_function}",
+    "owner": "<variable that should have freed the memory>",
+    "root_cause_code": "{cause_code}",
+    "root_cause_comment": "<why this line causes the leak>",
+    "contributing_codes": [
+      {{"code": "<important line>", "comment": "<its role in the leak>"}},
+      {{"code": "<other line>", "comment": "<its role>"}}
+    ],
+    "context_before_code": "<line just before root cause or empty>",
+    "context_after_code": "<line just after root cause or empty>"
+  }},
+  "resolution_principle": "In <function>(), <action to do> before/after <existing code line> or before function ends",
+  "resolution_code": "<exact C code to insert>",
+  "explanations": "<pedagogical explanation of why this solution works> + <best practice rule>"
+}}
+"""
+
+
 def _build_prompt(
     error_data: ValgrindError,
     code_context: str,
@@ -253,16 +509,9 @@ def _build_prompt(
         root_cause: Root cause identified by memory_tracker (optional).
 
     Returns:
-        Complete prompt string for Mistral AI.
+        User message for Mistral AI (instructions are in _SYSTEM_PROMPT).
     """
 
-    # Type de leak en texte
-    type_labels = {
-        1: "Type 1: Memory was never freed",
-        2: "Type 2: Pointer was lost before freeing memory",
-        3: "Type 3: Container was freed before its content",
-    }
-
     # Infos root cause
     gdb_trace = root_cause.get("gdb_trace") if root_cause else None
 
@@ -272,7 +521,7 @@ def _build_prompt(
 ROOT CAUSE (identified by analysis)
 ====================================================
 
-{type_labels.get(root_cause["type"], "Unknown type")}
+{_ROOT_CAUSE_TYPE_LABELS.get(root_cause["type"], "Unknown type")}
 
 File      : {root_cause.get("file", "unknown")}
 Function  : {root_cause["function"]}()
@@ -282,13 +531,7 @@ Memory path:
 {_format_steps(root_cause.get("steps", []))}
 """
     else:
-        root_cause_section = """
-====================================================
-ROOT CAUSE
-====================================================
-
-Not identified (manual analysis required)
-"""
+        root_cause_section = _ROOT_CAUSE_NOT_IDENTIFIED
 
     # GDB execution trace section (when available)
     if gdb_trace:
@@ -314,87 +557,38 @@ Use this trace as the primary source to understand what happened.
     else:
         source_code_label = "SOURCE CODE"
 
-    prompt = f"""You are a C and memory management expert. You must explain a memory leak in a pedagogical way.
-
-====================================================
-VALGRIND REPORT
-====================================================
-
-{error_data.get("bytes", "?")} bytes in {error_data.get("blocks", "?")} blocks are {error_data.get("type", "definitely lost")}
-Allocation function: {error_data.get("function", "unknown")}()
-File: {error_data.get("file", "unknown")}
-Line: {error_data.get("line", "?")}
-{execution_trace_section}
-====================================================
-{source_code_label}
-====================================================
-
-{code_context}
-{root_cause_section}
-
-====================================================
-YOUR MISSION
-====================================================
-
-1. Explain the diagnosis in 2-3 clear sentences
-2. Provide step-by-step pedagogical reasoning (based on the memory path above)
-3. Identify important code lines (contributing_codes)
-4. Propose a solution with corrective code
-
-CRITICAL: If an execution trace is provided above, base your reasoning ONLY on the lines that were actually executed. A line that appears in the source code but NOT in the execution trace was NOT executed during this run. Do not assume it was.
-
-====================================================
-JSON FORMAT (only, no text around)
-====================================================
-
-{{
-  "leak_type": {root_cause["type"] if root_cause else 1},
-  "diagnosis": "<clear explanation of the problem in 2-3 sentences>",
-  "reasoning": [
-    "Transform each step from 'Memory path' above into a clear, factual sentence",
-    "Use real variable names, line numbers, and function names from the steps",
-    "Example: 'ALLOC: ptr in func()' becomes 'malloc() allocates memory for ptr in func()'",
-    "Keep it factual and descriptive, not pedagogical"
-  ],
-  "real_cause": {{
-    "file": "{root_cause.get("file", "unknown") if root_cause else "unknown"}",
-    "function": "{root_cause["function"] if root_cause else "unknown"}",
-    "owner": "<variable that should have freed the memory>",
-    "root_cause_code": "{str(root_cause["line"]).strip() if root_cause else ""}",
-    "root_cause_comment": "<why this line causes the leak>",
-    "contributing_codes": [
-      {{"code": "<important line>", "comment": "<its role in the leak>"}},
-      {{"code": "<other line>", "comment": "<its role>"}}
-    ],
-    "context_before_code": "<line just before root cause or empty>",
-    "context_after_code": "<line just after root cause or empty>"
-  }},
-  "resolution_principle": "In <function>(), <action to do> before/after <existing code line> or before function ends",
-  "resolution_code": "<exact C code to insert>",
-  "explanations": "<pedagogical explanation of why this solution works> + <best practice rule>"
-}}
-
-IMPORTANT RULES:
-- Use simple and pedagogical language
-- Reasoning must guide the user step by step
-- In "reasoning": no numbering, maximum 15 words per step
-- Don't copy raw steps, rephrase them in an understandable way
-- contributing_codes: only lines BEFORE root_cause_code
-- root_cause_comment: maximum 10 words
-- resolution_principle: mention function, action, and reference line
-- When the root cause is a closing brace (pointer lost at end of scope), the fix must be placed just before that closing brace, not earlier in the function
-- JSON only, no text around
-"""
-
-    return prompt
-
-
-def _call_mistral_api(prompt: str) -> str:
+    return _PROMPT_TEMPLATE.format(
+        bytes=error_data.get("bytes", "?"),
+        blocks=error_data.get("blocks", "?"),
+        type=error_data.get("type", "definitely lost"),
+        function=error_data.get("function", "unknown"),
+        file=error_data.get("file", "unknown"),
+        line=error_data.get("line", "?"),
+        execution_trace_section=execution_trace_section,
+        source_code_label=source_code_label,
+        code_context=code_context,
+        root_cause_section=root_cause_section,
+        leak_type=root_cause["type"] if root_cause else 1,
+        cause_file=root_cause.get("file", "unknown") if root_cause else "unknown",
+        cause_function=root_cause["function"] if root_cause else "unknown",
+        cause_code=str(root_cause["line"]).strip() if root_cause else "",
+    )
+
+
+def _call_mistral_api(
+    prompt: str,
+    model: Optional[str] = None,
+    max_tokens: Optional[int] = None,
+    temperature: float = 0.0,
+) -> str:
     """
     Execute Mistral API call.
 
     Args:
         prompt: Complete prompt string.
+        model: Model name (default: MISTRAL_MODEL, or mistral-small-latest).
+        max_tokens: Reply length cap (default: MISTRAL_MAX_TOKENS, or 2048).
+        temperature: Sampling temperature (0 for reproducible JSON).
 
     Returns:
         Raw response content from Mistral API.
@@ -403,10 +597,61 @@ def _call_mistral_api(prompt: str) -> str:
         Exception: If API call fails.
     """
     try:
-        response = _get_client().chat.complete(
-            model="mistral-small-latest", messages=[{"role": "user", "content": prompt}]
-        )
-        return response.choices[0].message.content
+        # Client first: it loads .env, which may set the overrides below
+        client = _get_client()
+
+        if model is None:
+            model = _model_name()
+        if max_tokens is None:
+            max_tokens = _env_int("MISTRAL_MAX_TOKENS", _DEFAULT_MAX_TOKENS)
+
+        attempt = 0
+        while True:
+            try:
+                response = client.chat.complete(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": _SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt},
+                    ],
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    response_format={"type": _RESPONSE_FORMAT},
+                )
+                return response.choices[0].message.content
+
+            except Exception as e:
+                attempt += 1
+                delay = _retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
 
     except Exception as e:
         raise Exception(f"Mistral API call failed: {str(e)}")
+
+
+def _retry_delay(error: Exception, attempt: int) -> Optional[float]:
+    """
+    Decide whether a failed API call is retried, and after how long.
+
+    Args:
+        error: Exception raised by the Mistral client.
+        attempt: Number of failed attempts so far (1 for the first).
+
+    Returns:
+        Seconds to wait before retrying, or None to give up.
+    """
+
+    # SDK errors carry the HTTP status; anything else is not transient
+    status = getattr(error, "status_code", None)
+    if status not in _RETRY_STATUSES or attempt >= _MAX_ATTEMPTS:
+        return None
+
+    # Honor the server's Retry-After (seconds) when it sends one
+    raw_response = getattr(error, "raw_response", None)
+    retry_after = getattr(raw_response, "headers", {}).get("retry-after", "")
+    if retry_after.isdigit():
+        return min(float(retry_after), _MAX_BACKOFF)
+
+    return min(2 ** (attempt - 1), _MAX_BACKOFF) + random.random()
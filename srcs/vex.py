@@ -15,7 +15,7 @@ import threading
 import time
 from typing import Optional
 
-from builder import rebuild_project
+from builder import start_rebuild, finish_rebuild
 from code_extractor import extract_call_stack
 from colors import RESET, RED
 from display import display_analysis
@@ -28,7 +28,7 @@ from memory_tracker import (
     is_malloc,
 )
 from menu import interactive_menu
-from mistral_analyzer import analyze_with_mistral, MistralAPIError
+from mistral_analyzer import start_analysis, MistralAPIError
 from type_defs import ParsedValgrindReport, ValgrindError
 from valgrind_parser import parse_valgrind_report
 from valgrind_runner import (
@@ -383,7 +383,13 @@ def _process_all_leaks(parsed_errors: list[ValgrindError], executable: str) -> s
 
     t = start_block_spinner("Calling Mistral AI")
 
+    next_analysis = None
+
     for i, error in enumerate(parsed_errors, 1):
+        # Already running if prefetched while the previous leak was displayed
+        pending = next_analysis or start_analysis(error)
+        next_analysis = None
+
         try:
             # Hide cursor before spinner
             print("\033[?25l", end="", flush=True)
@@ -393,11 +399,16 @@ def _process_all_leaks(parsed_errors: list[ValgrindError], executable: str) -> s
             time.sleep(0.1)
 
             # Analyze error
-            analysis = analyze_with_mistral(error)
+            analysis = pending.result()
 
             # Stop spinner after analysis
             stop_block_spinner(t, "Calling Mistral AI")
 
+            # Analyze the next leak while the user reads this one (one
+            # request at a time, so API rate limits are unaffected)
+            if i < len(parsed_errors):
+                next_analysis = start_analysis(parsed_errors[i])
+
             # Show real cursor
             print("\033[?25h", end="", flush=True)
 
@@ -431,13 +442,24 @@ def _process_all_leaks(parsed_errors: list[ValgrindError], executable: str) -> s
                 break
 
             if choice == "verify":
-                # Recompile
-                result = rebuild_project(executable)
+                # Recompile in the background, spinner while make runs
+                build = start_rebuild(executable)
+                if isinstance(build, dict):
+                    # make could not be started (no Makefile...): no spinner
+                    result = build
+                else:
+                    print("\033[?25l", end="", flush=True)
+                    t = start_spinner("Compiling project")
+                    result = finish_rebuild(build)
+                    stop_spinner(t, "Compiling project", result["success"])
+                    print("\033[?25h", end="", flush=True)
                 if not result["success"]:
                     print(result["output"])
                     input("\n[Press Enter to continue...]]")
                     continue
 
+                # A prefetch still running is a daemon thread: its result is
+                # for the old binary and is dropped without waiting for it
                 return "need_recompile"
 
             elif choice == "next":
@@ -450,6 +472,7 @@ def _process_all_leaks(parsed_errors: list[ValgrindError], executable: str) -> s
                     return "completed"
 
             elif choice == "quit":
+                # A prefetch still running is a daemon thread: not waited for
                 print()
                 return "quit"
 
@@ -5,14 +5,25 @@ Module responsible for displaying the welcome screen with logo,
 progress spinners, and summary before starting leak analysis.
 """
 
-import os
 import sys
 import threading
 import time
 
-from colors import RESET, GREEN, DARK_GREEN, LIGHT_YELLOW, DARK_YELLOW, LIGHT_PINK
+from colors import (
+    RESET,
+    GREEN,
+    DARK_GREEN,
+    LIGHT_YELLOW,
+    DARK_YELLOW,
+    LIGHT_PINK,
+    RED,
+)
 from type_defs import ParsedValgrindReport
 
+# What `clear` writes (home, erase screen, erase scrollback), without
+# spawning a shell and the clear binary
+_CLEAR_SCREEN = "\033[H\033[2J\033[3J"
+
 # Global flags for spinner control
 _spinner_active = False
 _block_spinner_active = False
@@ -21,7 +32,8 @@ _block_spinner_active = False
 def clear_screen() -> None:
     """Clear the terminal screen."""
 
-    os.system("clear")
+    sys.stdout.write(_CLEAR_SCREEN)
+    sys.stdout.flush()
 
 
 def display_logo() -> None:
@@ -125,19 +137,21 @@ def start_spinner(message: str) -> threading.Thread:
     return thread
 
 
-def stop_spinner(thread: threading.Thread, message: str) -> None:
+def stop_spinner(thread: threading.Thread, message: str, success: bool = True) -> None:
     """
-    Stop the spinner and display a success checkmark.
+    Stop the spinner and display a success checkmark (or a failure cross).
 
     Args:
         thread: The spinner thread to stop
-        message: The success message to display
+        message: The message to display
+        success: Whether the step succeeded
     """
 
     global _spinner_active
     _spinner_active = False
     thread.join()
-    sys.stdout.write(f"\r{GREEN}✓{RESET} {message}\n")
+    mark = f"{GREEN}✓" if success else f"{RED}✗"
+    sys.stdout.write(f"\r{mark}{RESET} {message}\n")
     sys.stdout.flush()
 
 